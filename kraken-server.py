@@ -1,16 +1,38 @@
-# pip install fastmcp requests python-dotenv
+# pip install fastmcp "httpx[http2,brotli]" python-dotenv
 import os
+import asyncio
+import ssl
 import time
+import logging
 import base64
-import hmac
+import binascii
+import re
 import hashlib
+import functools
 import urllib.parse
 from typing import Optional, Literal, Union
 
-import requests
+import httpx
 from fastmcp import FastMCP
 from dotenv import load_dotenv
 
+from kraken_sign import next_nonce as _nonce
+
+try:  # optional native signer (see kraken_fast/), same API as kraken_sign
+    from kraken_fast import signing_key as _signing_key, sign as _sign
+    _NATIVE_SIGNER = True
+except ImportError:
+    from kraken_sign import signing_key as _signing_key, sign as _sign
+    _NATIVE_SIGNER = False
+
+_quote_plus = urllib.parse.quote_plus
+_is_url_safe = re.compile(r"[A-Za-z0-9_.~-]*").fullmatch
+
+try:  # optional: 2-5x faster parsing of large Depth/OHLC/history responses
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
+
 
 load_dotenv()
 
@@ -35,8 +57,51 @@ TRADES_HISTORY_PATH = "/0/private/TradesHistory"
 
 API_KEY = os.getenv("KRAKEN_API_KEY")
 API_SECRET = os.getenv("KRAKEN_API_SECRET")  # base64 string from Kraken
+try:
+    _SIGNING_KEY = _signing_key(base64.b64decode(API_SECRET)) if API_SECRET else None
+except binascii.Error:
+    _SIGNING_KEY = None  # reported by _require_keys on the first private call
+
+# Private paths pre-encoded once for the signing message.
+_PRIVATE_PATHS_B = {
+    path: path.encode()
+    for path in (
+        ADD_ORDER_PATH,
+        CANCEL_ORDER_PATH,
+        OPEN_ORDERS_PATH,
+        AMEND_ORDER_PATH,
+        CANCEL_ALL_AFTER_PATH,
+        BALANCE_PATH,
+        CLOSED_ORDERS_PATH,
+        TRADES_HISTORY_PATH,
+    )
+}
 
 mcp = FastMCP("Kraken Pro MCP")
+logger = logging.getLogger(__name__)
+if not logger.handlers:
+    # stderr only: stdout carries the MCP stdio protocol
+    _log_handler = logging.StreamHandler()
+    _log_handler.setFormatter(logging.Formatter("%(levelname)s %(name)s: %(message)s"))
+    logger.addHandler(_log_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+# One shared async client for every tool call: keep-alive reuses the TCP+TLS
+# connection to api.kraken.com, and HTTP/2 multiplexes concurrent tool calls
+# over it instead of serializing them on worker threads.
+# Options go on the client, not an explicit transport, so HTTPS_PROXY and
+# friends from the environment are still honoured (trust_env).
+_CLIENT = httpx.AsyncClient(
+    http2=True,
+    limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+    headers={
+        # constant for every private POST; ignored on the body-less public GETs
+        "Content-Type": "application/x-www-form-urlencoded; charset=utf-8",
+        "User-Agent": "fastmcp-kraken-pro/1.0",
+    },
+    timeout=15.0,
+)
 
 class KrakenError(RuntimeError):
     pass
@@ -59,61 +124,124 @@ def _require_keys():
         raise KrakenError(
             "Missing KRAKEN_API_KEY / KRAKEN_API_SECRET env vars."
         )
-
-def _public_get(url_path: str, params: dict | None = None, timeout: float = 15.0) -> dict:
-    """Helper for public endpoints (no auth)."""
-    url = KRAKEN_BASE + url_path
-    r = requests.get(url, params=params or {}, timeout=timeout)
-    r.raise_for_status()
-    j = r.json()
+    if _SIGNING_KEY is None:
+        raise KrakenError("KRAKEN_API_SECRET is not valid base64.")
+
+def _result(r: httpx.Response) -> dict:
+    """Unwrap Kraken's {"error": [...], "result": {...}} envelope."""
+    sc = r.status_code
+    if sc >= 400:
+        raise KrakenError(f"HTTP {sc}: {r.text[:200]}")
+    j = _json_loads(r.content)
     if j.get("error"):
         raise KrakenError("; ".join(j["error"]))
     if "result" not in j:
         raise KrakenError("Kraken API response missing 'result' key.")
     return j["result"]
 
-def _sign(url_path: str, payload: dict) -> str:
+# Slow-changing public endpoints are served from memory for this long.
+_PUBLIC_TTL_NS = {
+    TIME_PATH: 1_000_000_000,
+    SYSTEM_STATUS_PATH: 5_000_000_000,
+    ASSETS_PATH: 3600_000_000_000,
+    ASSET_PAIRS_PATH: 3600_000_000_000,
+}
+_public_cache: dict[tuple, tuple[int, dict]] = {}  # key -> (expiry_ns, result)
+_PUBLIC_CACHE_MAX = 256  # keys include free-form asset/pair lists
+
+async def _public_get(url_path: str, params: dict | None = None, timeout: float = 15.0) -> dict:
+    """Helper for public endpoints (no auth)."""
+    ttl = _PUBLIC_TTL_NS.get(url_path)
+    if ttl:
+        key = (url_path, frozenset(params.items()) if params else None)
+        now = time.monotonic_ns()
+        hit = _public_cache.get(key)
+        if hit is not None:
+            if hit[0] > now:
+                return hit[1]
+            del _public_cache[key]
+    url = KRAKEN_BASE + url_path
+    r = await _CLIENT.get(url, params=params or {}, timeout=timeout)
+    result = _result(r)
+    if ttl:
+        if len(_public_cache) >= _PUBLIC_CACHE_MAX:
+            for k in [k for k, (exp, _) in _public_cache.items() if exp <= now]:
+                del _public_cache[k]
+            if len(_public_cache) >= _PUBLIC_CACHE_MAX:
+                _public_cache.clear()
+        _public_cache[key] = (now + ttl, result)
+    return result
+
+def _encode_safe(payload: dict) -> str:
     """
-    Kraken Spot REST signature:
-    API-Sign = HMAC-SHA512( url_path + SHA256(nonce + postdata), base64_decode(secret) )
-    Docs: https://docs.kraken.com/api/docs/guides/spot-rest-auth/
+    Same output as urllib.parse.urlencode, but values that are already
+    URL-safe (numbers, pairs, enums, txids: nearly all of a Kraken payload)
+    are joined as-is; only the rest (e.g. free-form cl_ord_id) get quoted.
     """
+    parts = []
+    for k, v in payload.items():
+        v = str(v)
+        parts.append(f"{k}={v}" if _is_url_safe(v) else f"{k}={_quote_plus(v)}")
+    return "&".join(parts)
+
+async def _private_post(url_path: str, data: dict, timeout: float = 15.0) -> dict:
+    data = _normalize_payload(data)
     # urlencode payload for POST body
-    postdata = urllib.parse.urlencode(payload)
-    # nonce must be string + strictly increasing per key
-    encoded = (str(payload["nonce"]) + postdata).encode()
-    sha256 = hashlib.sha256(encoded).digest()
-    message = url_path.encode() + sha256
-    mac = hmac.new(base64.b64decode(API_SECRET), message, hashlib.sha512)
-    return base64.b64encode(mac.digest()).decode(), postdata
-
-def _private_post(url_path: str, data: dict, timeout: float = 15.0) -> dict:
+    postdata = _encode_safe(data)
+    return await _private_post_encoded(url_path, str(data["nonce"]), postdata, timeout)
+
+async def _private_post_encoded(
+    url_path: str, nonce: str, postdata: str, timeout: float = 15.0
+) -> dict:
+    """Sign and send an already-urlencoded body (which must include `nonce`)."""
     _require_keys()
     url = KRAKEN_BASE + url_path
-    data = _normalize_payload(data)                     # <-- add this line
-    sig, postdata = _sign(url_path, data)
-    headers = {
-        "API-Key": API_KEY,
-        "API-Sign": sig,
-        "Content-Type": "application/x-www-form-urlencoded; charset=utf-8",
-        "User-Agent": "fastmcp-kraken-pro/1.0",
-    }
-    r = requests.post(url, headers=headers, data=postdata, timeout=timeout)
-    r.raise_for_status()
-    j = r.json()
-    if j.get("error"):
-        raise KrakenError("; ".join(j["error"]))
-    if "result" not in j:
-        raise KrakenError("Kraken API response missing 'result' key.")
-    return j["result"]
+    path_b = _PRIVATE_PATHS_B.get(url_path) or url_path.encode()
+    sig = _sign(path_b, nonce, postdata, _SIGNING_KEY)
+    headers = {"API-Key": API_KEY, "API-Sign": sig}
+    r = await _CLIENT.post(url, headers=headers, content=postdata, timeout=timeout)
+    return _result(r)
+
+@functools.lru_cache(maxsize=256)
+def _encode_fixed(
+    pair: str, side: str, ordertype: str, timeinforce: str | None, validate: bool
+) -> str:
+    """
+    urlencoded AddOrder fields that repeat across a strategy's orders;
+    only the per-order fields need encoding on each call.
+    """
+    return _encode_safe(_normalize_payload({
+        "pair": pair,
+        "type": side,
+        "ordertype": ordertype,
+        "timeinforce": timeinforce,  # GTC (default), IOC, GTD
+        "validate": validate or None,  # server checks but does not place
+    }))
 
-def _nonce() -> str:
-    # millisecond nonce as string (strictly increasing per key)
-    return str(int(time.time() * 1000))
+def _check_crypto_backend():
+    """
+    Signing relies on libcrypto's SHA-256 / HMAC-SHA512 (SHA-NI / AVX2 asm on
+    modern builds). Warn if hashlib fell back to CPython's builtin hashes.
+    The native kraken_fast signer uses ring instead, so hashlib is moot then.
+    """
+    if _NATIVE_SIGNER:
+        logger.info("Signing with kraken_fast (ring)")
+        return
+    logger.info("Signing with %s", ssl.OPENSSL_VERSION)
+    for name in ("sha256", "sha512"):
+        ctor = getattr(hashlib, name)
+        if name not in hashlib.algorithms_available or not ctor.__name__.startswith("openssl_"):
+            logger.warning(
+                "hashlib.%s is not OpenSSL-backed; request signing will be slower.", name
+            )
+    if ssl.OPENSSL_VERSION_INFO < (3, 0):
+        logger.warning("%s is older than 3.0; upgrade for faster signing.", ssl.OPENSSL_VERSION)
+
+_check_crypto_backend()
 
 # ------------------ Trading API ------------------
 @mcp.tool
-def add_order(
+async def add_order(
     pair: str,
     side: Literal["buy", "sell"],
     ordertype: Literal[
@@ -140,30 +268,24 @@ def add_order(
     NOTE: `validate=True` (default) will *not* execute the order; it only validates.
     Set `validate=False` to actually place the order.
     """
-    data = {
-        "nonce": _nonce(),
-        "pair": pair,
-        "type": side,
-        "ordertype": ordertype,
-        "volume": str(volume),
-    }
+    nonce = _nonce()
+    data = {"volume": str(volume)}
     if price is not None:
         data["price"] = str(price)
     if price2 is not None:
         data["price2"] = str(price2)
-    if timeinforce is not None:
-        data["timeinforce"] = timeinforce  # GTC (default), IOC, GTD
     if userref is not None:
         data["userref"] = int(userref)
     if cl_ord_id is not None:
         data["cl_ord_id"] = cl_ord_id
-    if validate:
-        data["validate"] = True  # server checks but does not place
-
-    return _private_post(ADD_ORDER_PATH, data)
+    postdata = (
+        f"nonce={nonce}&{_encode_safe(data)}&"
+        + _encode_fixed(pair, side, ordertype, timeinforce, bool(validate))
+    )
+    return await _private_post_encoded(ADD_ORDER_PATH, nonce, postdata)
 
 @mcp.tool
-def cancel_order(
+async def cancel_order(
     txid_or_userref: str,
 ) -> dict:
     """
@@ -174,10 +296,10 @@ def cancel_order(
         "nonce": _nonce(),
         "txid": txid_or_userref,
     }
-    return _private_post(CANCEL_ORDER_PATH, data)
+    return await _private_post(CANCEL_ORDER_PATH, data)
 
 @mcp.tool
-def open_orders(userref: Optional[int] = None, trades: bool = False) -> dict:
+async def open_orders(userref: Optional[int] = None, trades: bool = False) -> dict:
     """
     Fetch open orders. Optionally filter by userref and include `trades` detail.
     """
@@ -187,10 +309,10 @@ def open_orders(userref: Optional[int] = None, trades: bool = False) -> dict:
     }
     if userref is not None:
         data["userref"] = int(userref)
-    return _private_post(OPEN_ORDERS_PATH, data)
+    return await _private_post(OPEN_ORDERS_PATH, data)
 
 @mcp.tool
-def amend_order(
+async def amend_order(
     order_id: Optional[str] = None,
     cl_ord_id: Optional[str] = None,
     order_qty: Optional[str] = None,      # e.g. "1.25"
@@ -204,10 +326,11 @@ def amend_order(
     You MUST provide one identifier (order_id or cl_ord_id) and at least one
     amendable field (order_qty, limit_price, trigger_price, display_qty).
     """
-    if not (order_id or cl_ord_id):
-        raise KrakenError("Provide order_id or cl_ord_id.")
-    if not any([order_qty, limit_price, trigger_price, display_qty]):
-        raise KrakenError("Provide at least one field to amend.")
+    if not ((order_id or cl_ord_id)
+            and (order_qty or limit_price or trigger_price or display_qty)):
+        raise KrakenError(
+            "Provide order_id or cl_ord_id and at least one field to amend."
+        )
 
     data = {"nonce": _nonce()}
     if order_id is not None:
@@ -225,10 +348,10 @@ def amend_order(
     if post_only is not None:
         data["post_only"] = bool(post_only)
 
-    return _private_post(AMEND_ORDER_PATH, data)
+    return await _private_post(AMEND_ORDER_PATH, data)
 
 @mcp.tool
-def cancel_all_orders_after(timeout_seconds: int) -> dict:
+async def cancel_all_orders_after(timeout_seconds: int) -> dict:
     """
     Dead man's switch: set countdown to cancel ALL your orders after `timeout_seconds`.
     Pass 0 to disable the switch.
@@ -237,48 +360,48 @@ def cancel_all_orders_after(timeout_seconds: int) -> dict:
         "nonce": _nonce(),
         "timeout": int(timeout_seconds),
     }
-    return _private_post(CANCEL_ALL_AFTER_PATH, data)
+    return await _private_post(CANCEL_ALL_AFTER_PATH, data)
 
 # ------------------ Market Data tools ------------------
 
 @mcp.tool
-def server_time() -> dict:
+async def server_time() -> dict:
     """Kraken server time (UTC)."""
-    return _public_get(TIME_PATH)
+    return await _public_get(TIME_PATH)
 
 @mcp.tool
-def system_status() -> dict:
+async def system_status() -> dict:
     """Current system status / trading mode."""
-    return _public_get(SYSTEM_STATUS_PATH)
+    return await _public_get(SYSTEM_STATUS_PATH)
 
 @mcp.tool
-def asset_info(assets: str | None = None, aclass: str | None = None) -> dict:
+async def asset_info(assets: str | None = None, aclass: str | None = None) -> dict:
     """
     Asset metadata. Example assets: 'XBT,ETH,USDT'
     aclass (optional): 'currency' (default) or other classes per Kraken.
     """
-    params = {
-        key: value
-        for key, value in [("asset", assets), ("aclass", aclass)]
-        if value is not None
-    }
-    return _public_get(ASSETS_PATH, params)
+    params = {}
+    if assets is not None:
+        params["asset"] = assets
+    if aclass is not None:
+        params["aclass"] = aclass
+    return await _public_get(ASSETS_PATH, params)
 
 @mcp.tool
-def tradable_asset_pairs(pairs: str | None = None, info: str | None = None) -> dict:
+async def tradable_asset_pairs(pairs: str | None = None, info: str | None = None) -> dict:
     """
     Tradable pairs & metadata. Example pairs: 'XBTUSD,ETHUSD'.
     info (optional): 'info', 'leverage', 'fees', 'margin', etc.
     """
-    params = {
-        key: value
-        for key, value in [("pair", pairs), ("info", info)]
-        if value is not None
-    }
-    return _public_get(ASSET_PAIRS_PATH, params)
+    params = {}
+    if pairs is not None:
+        params["pair"] = pairs
+    if info is not None:
+        params["info"] = info
+    return await _public_get(ASSET_PAIRS_PATH, params)
 
 @mcp.tool
-def ticker(pairs: str | None = None) -> dict:
+async def ticker(pairs: str | None = None) -> dict:
     """
     Level-1 ticker stats. Leave `pairs` None to get ALL.
     Example: 'XBTUSD,ETHUSD'
@@ -286,10 +409,10 @@ def ticker(pairs: str | None = None) -> dict:
     params = {}
     if pairs:
         params["pair"] = pairs
-    return _public_get(TICKER_PATH, params)
+    return await _public_get(TICKER_PATH, params)
 
 @mcp.tool
-def ohlc(pair: str, interval: int = 1, since: int | None = None) -> dict:
+async def ohlc(pair: str, interval: int = 1, since: int | None = None) -> dict:
     """
     OHLC candles.
     interval (minutes): 1, 5, 15, 30, 60, 240, 1440, 10080, 21600
@@ -298,10 +421,10 @@ def ohlc(pair: str, interval: int = 1, since: int | None = None) -> dict:
     params = {"pair": pair, "interval": int(interval)}
     if since is not None:
         params["since"] = int(since)
-    return _public_get(OHLC_PATH, params)
+    return await _public_get(OHLC_PATH, params)
 
 @mcp.tool
-def order_book(pair: str, count: int | None = None) -> dict:
+async def order_book(pair: str, count: int | None = None) -> dict:
     """
     L2 order book (aggregated per price level).
     count: optional max levels per side.
@@ -309,47 +432,61 @@ def order_book(pair: str, count: int | None = None) -> dict:
     params = {"pair": pair}
     if count is not None:
         params["count"] = int(count)
-    return _public_get(DEPTH_PATH, params)
+    return await _public_get(DEPTH_PATH, params)
 
 @mcp.tool
-def recent_trades(pair: str, since: int | None = None) -> dict:
+async def recent_trades(pair: str, since: int | None = None) -> dict:
     """
     Recent trades. Use the returned 'last' field as your next `since`.
     """
     params = {"pair": pair}
     if since is not None:
         params["since"] = int(since)
-    return _public_get(TRADES_PATH, params)
+    return await _public_get(TRADES_PATH, params)
 
 @mcp.tool
-def recent_spreads(pair: str, since: int | None = None) -> dict:
+async def recent_spreads(pair: str, since: int | None = None) -> dict:
     """
     Recent top-of-book spreads (bid/ask).
     """
     params = {"pair": pair}
     if since is not None:
         params["since"] = int(since)
-    return _public_get(SPREAD_PATH, params)
+    return await _public_get(SPREAD_PATH, params)
+
+@mcp.tool
+async def market_snapshot(pair: str, depth: int = 10) -> dict:
+    """
+    Ticker, order book (`depth` levels per side), recent spreads and 1-minute
+    OHLC for one pair, fetched concurrently in a single round-trip time.
+    """
+    t, ob, sp, oh = await asyncio.gather(
+        _public_get(TICKER_PATH, {"pair": pair}),
+        _public_get(DEPTH_PATH, {"pair": pair, "count": int(depth)}),
+        _public_get(SPREAD_PATH, {"pair": pair}),
+        _public_get(OHLC_PATH, {"pair": pair, "interval": 1}),
+    )
+    return {"ticker": t, "book": ob, "spread": sp, "ohlc": oh}
 
 
 # ------------------ Account Data ------------------
 @mcp.tool
-def account_balance() -> dict:
+async def account_balance() -> dict:
     """
     Get Account Balance: all cash balances, net of pending withdrawals.
     """
     data = {"nonce": _nonce()}
-    return _private_post(BALANCE_PATH, data)
+    return await _private_post(BALANCE_PATH, data)
 
 
 @mcp.tool
-def closed_orders(trades: bool = False, userref: int | None = None,
-                  start: int | str | None = None, end: int | str | None = None,
-                  ofs: int | None = None, closetime: str | None = None,
-                  consolidate_taker: bool | None = None,
-                  without_count: bool | None = None,
-                  cl_ord_id: str | None = None,
-                  rebase_multiplier: str | None = None) -> dict:
+async def closed_orders(trades: bool = False, userref: int | None = None,
+                        start: int | str | None = None, end: int | str | None = None,
+                        ofs: int | None = None, closetime: str | None = None,
+                        consolidate_taker: bool | None = None,
+                        without_count: bool | None = None,
+                        cl_ord_id: str | None = None,
+                        rebase_multiplier: str | None = None) -> dict:
     data = {"nonce": _nonce()}
     if trades is not None:              data["trades"] = trades
     if userref is not None:             data["userref"] = int(userref)
@@ -361,10 +498,10 @@ def closed_orders(trades: bool = False, userref: int | None = None,
     if without_count is not None:       data["without_count"] = without_count
     if cl_ord_id is not None:           data["cl_ord_id"] = cl_ord_id
     if rebase_multiplier is not None:   data["rebase_multiplier"] = rebase_multiplier
-    return _private_post(CLOSED_ORDERS_PATH, data)
+    return await _private_post(CLOSED_ORDERS_PATH, data)
 
 @mcp.tool
-def trades_history(
+async def trades_history(
     type: Literal[
         "all",
         "any position",
@@ -399,7 +536,7 @@ def trades_history(
     if rebase_multiplier is not None:
         data["rebase_multiplier"] = rebase_multiplier
 
-    return _private_post(TRADES_HISTORY_PATH, data)
+    return await _private_post(TRADES_HISTORY_PATH, data)
 
 if __name__ == "__main__":
     mcp.run()
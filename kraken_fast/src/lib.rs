@@ -0,0 +1,44 @@
+//! Native drop-in for `kraken_sign.signing_key` / `kraken_sign.sign`.
+//!
+//! Same inputs, same output:
+//! API-Sign = HMAC-SHA512( url_path + SHA256(nonce + postdata), secret ), base64-encoded.
+//! `ring` dispatches to SHA-NI / AVX2 assembly where the CPU supports it.
+
+use base64::engine::general_purpose::STANDARD;
+use base64::Engine;
+use pyo3::prelude::*;
+use ring::{digest, hmac};
+
+/// HMAC-SHA512 key with the ipad/opad state precomputed once.
+#[pyclass(frozen)]
+struct SigningKey {
+    key: hmac::Key,
+}
+
+#[pyfunction]
+fn signing_key(secret: &[u8]) -> SigningKey {
+    SigningKey {
+        key: hmac::Key::new(hmac::HMAC_SHA512, secret),
+    }
+}
+
+#[pyfunction]
+fn sign(url_path: &[u8], nonce: &str, postdata: &str, key: PyRef<'_, SigningKey>) -> String {
+    let mut ctx = digest::Context::new(&digest::SHA256);
+    ctx.update(nonce.as_bytes());
+    ctx.update(postdata.as_bytes());
+    let sha256 = ctx.finish();
+
+    let mut mac = hmac::Context::with_key(&key.key);
+    mac.update(url_path);
+    mac.update(sha256.as_ref());
+    STANDARD.encode(mac.sign().as_ref())
+}
+
+#[pymodule]
+fn kraken_fast(m: &Bound<'_, PyModule>) -> PyResult<()> {
+    m.add_class::<SigningKey>()?;
+    m.add_function(wrap_pyfunction!(signing_key, m)?)?;
+    m.add_function(wrap_pyfunction!(sign, m)?)?;
+    Ok(())
+}